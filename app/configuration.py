@@ -14,6 +14,9 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import orjson
+from fastapi import Request, Response
+from fastapi.encoders import jsonable_encoder
 from fastapi.routing import APIRouter
 
 from app.auth.api import oauth
@@ -32,14 +35,22 @@ from app.settings import (
 )
 from app.stac.settings import STAC_CATEGORIES, STAC_ROOT_CONF
 from app.store.settings import STORE_MODE
+from app.utils.http import etag_for, etag_response
+
+TEXT_KEYS = frozenset(("title", "description", "name"))
+ALERT_TEXT_KEYS = frozenset(("message", "title"))
+ROOT_EXCLUDE_KEYS = frozenset(("id",))
+CATEGORY_EXCLUDE_KEYS = frozenset(("features",))
 
 router = APIRouter()
 
 
 @router.get("/")
-async def configuration() -> dict:
-    text_keys = ["title", "description", "name"]
-    exclude_keys = ["locales"]
+async def configuration(request: Request) -> Response:
+    return etag_response(request, _CONFIGURATION, _CONFIGURATION_ETAG)
+
+
+def build_configuration() -> dict:
     return {
         "auth": "oauth2" if oauth.create_client(GITLAB_OAUTH_NAME) else "token",
         "store": STORE_MODE,
@@ -48,73 +59,53 @@ async def configuration() -> dict:
         "mlflow": {"type": MLFLOW_TYPE, "url": MLFLOW_URL},
         "docs": {"url": DOCS_URL},
         "spaces": {**SPACES},
-        "root": {
-            **{
-                k: v
-                for k, v in STAC_ROOT_CONF.items()
-                if k not in ["id", *text_keys, *exclude_keys]
-            },
-            "locales": {
-                "en": {k: v for k, v in STAC_ROOT_CONF.items() if k in text_keys},
-                **{
-                    locale: dict(translation)
-                    for locale, translation in STAC_ROOT_CONF.get("locales", {}).items()
-                },
-            },
-        },
+        "root": localize(STAC_ROOT_CONF, TEXT_KEYS, exclude_keys=ROOT_EXCLUDE_KEYS),
         "categories": {
-            category_name: {
-                **{
-                    k: v
-                    for k, v in category.items()
-                    if k not in ["features", *text_keys, *exclude_keys]
-                },
-                "locales": {
-                    "en": {k: v for k, v in category.items() if k in text_keys},
-                    **{
-                        locale: dict(translation)
-                        for locale, translation in category.get("locales", {}).items()
-                    },
-                },
-            }
+            category_name: localize(
+                category, TEXT_KEYS, exclude_keys=CATEGORY_EXCLUDE_KEYS
+            )
             for category_name, category in STAC_CATEGORIES.items()
         },
-        "external_urls": normalize_external_urls(EXTERNAL_URLS, text_keys),
-        "alert_info": {
-            **{k: v for k, v in ALERT_MESSAGE.items() if k not in ["message", "title"]},
-            "locales": {
-                "en": {
-                    k: v for k, v in ALERT_MESSAGE.items() if k in ["message", "title"]
-                },
-                **{
-                    locale: dict(translation)
-                    for locale, translation in ALERT_MESSAGE.get("locales", {}).items()
-                },
-            },
-        },
+        "external_urls": normalize_external_urls(EXTERNAL_URLS),
+        "alert_info": localize(ALERT_MESSAGE, ALERT_TEXT_KEYS),
         "default_tags": {**TAGS_OPTIONS},
         "wizard": {"url": WIZARD_URL},
     }
 
 
-def normalize_external_urls(array: list[dict], text_keys: list[str]) -> list[dict]:
+def localize(
+    conf: dict,
+    text_keys: frozenset[str],
+    *,
+    exclude_keys: frozenset[str] = frozenset(),
+) -> dict:
+    """Move `text_keys` of `conf` into its "en" locale, in a single pass."""
+    base: dict = {}
+    en: dict = {}
+    for k, v in conf.items():
+        if k in text_keys:
+            en[k] = v
+        elif k != "locales" and k not in exclude_keys:
+            base[k] = v
+    locales = {
+        locale: dict(translation)
+        for locale, translation in conf.get("locales", {}).items()
+    }
+    return {**base, "locales": {"en": en, **locales}}
+
+
+def normalize_external_urls(array: list[dict]) -> list[dict]:
     def mapping(link: dict) -> dict:
         dropdown = link.get("dropdown", [])
         if not dropdown:
-            return {
-                **{k: v for k, v in link.items() if k not in text_keys},
-                "locales": {
-                    "en": {k: v for k, v in link.items() if k in text_keys},
-                    **dict(link.get("locales", {})),
-                },
-            }
+            return localize(link, TEXT_KEYS)
         return {
-            **{k: v for k, v in link.items() if k not in text_keys},
-            "locales": {
-                "en": {k: v for k, v in link.items() if k in text_keys},
-                **dict(link.get("locales", {})),
-            },
-            "dropdown": normalize_external_urls(dropdown, text_keys),
+            **localize(link, TEXT_KEYS),
+            "dropdown": normalize_external_urls(dropdown),
         }
 
     return list(map(mapping, array))
+
+
+_CONFIGURATION = orjson.dumps(jsonable_encoder(build_configuration()))
+_CONFIGURATION_ETAG = etag_for(_CONFIGURATION)
@@ -23,6 +23,7 @@ from logging.config import dictConfig
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import ORJSONResponse
 from fastapi.staticfiles import StaticFiles
 from starlette.middleware.sessions import SessionMiddleware
 
@@ -41,7 +42,7 @@ from app.settings import (
     STATIC_FILES_PATH,
     STATIC_UI_DIRNAME,
 )
-from app.utils.http import AiohttpClient
+from app.utils.http import aiohttp_client
 from app.utils.openapi import openapi_aggregator
 
 from .router import router as views_router
@@ -52,7 +53,6 @@ logger = logging.getLogger("app")
 
 @asynccontextmanager
 async def lifespan(app: FastAPI) -> AsyncGenerator[None, None]:  # noqa: ARG001
-    aiohttp_client = AiohttpClient()
     logger.debug("Connect http client")
     aiohttp_client.connect(timeout=HTTP_CLIENT_TIMEOUT)
     yield
@@ -68,6 +68,7 @@ app = FastAPI(
     root_path=API_PREFIX,
     docs_url="/api/docs",
     redoc_url="/api/redoc",
+    default_response_class=ORJSONResponse,
     lifespan=lifespan,
 )
 openapi_aggregator(app, SERVICES)
@@ -93,7 +94,7 @@ app.add_middleware(GZipMiddleware, minimum_size=1000)
 async def status() -> list[dict]:
     services = list(SERVICES)
     status_urls = [service["status"] for service in SERVICES.values()]
-    async with AiohttpClient() as client:
+    async with aiohttp_client as client:
         responses = await asyncio.gather(
             *(client.get(status_url) for status_url in status_urls)
         )
@@ -15,4 +15,4 @@
 # limitations under the License.
 
 from ._base import CursorPagination, ProviderClient
-from .gitlab import GitlabClient
+from .gitlab import GitlabClient, get_cached_user
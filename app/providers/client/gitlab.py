@@ -14,7 +14,7 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
-import json
+import asyncio
 import logging
 import os
 import re
@@ -22,6 +22,7 @@ from datetime import datetime
 from typing import Any, NotRequired, TypedDict, cast, no_type_check
 
 import aiohttp
+import orjson
 from fastapi import HTTPException, Request
 from fastapi.responses import StreamingResponse
 from pydantic import AnyHttpUrl
@@ -42,13 +43,14 @@ from app.providers.schemas import (
     Topic,
     User,
 )
-from app.settings import MLFLOW_URL
+from app.settings import CHECKER_CACHE_TIMEOUT, MLFLOW_URL
 from app.stac.api.category import FeatureVal, get_categories_from_topics
 from app.utils import geo
 from app.utils import markdown as md
+from app.utils.cache import get_or_set, hash_key
 from app.utils.http import (
-    AiohttpClient,
     HttpMethod,
+    aiohttp_client,
     clean_url,
     slugify,
     url_add_query_params,
@@ -61,6 +63,12 @@ logger = logging.getLogger("app")
 
 BBOX_LEN = 4
 
+RETRY_METHODS = frozenset(("GET", "HEAD"))
+RETRY_STATUSES = frozenset((429, 502, 503, 504))
+RETRY_MAX_ATTEMPTS = 3
+RETRY_BACKOFF = 0.5
+RETRY_MAX_DELAY = 10.0
+
 GITLAB_LICENSES_SPDX_MAPPING = {
     "agpl-3.0": "AGPL-3.0",
     "apache-2.0": "Apache-2.0",
@@ -312,7 +320,8 @@ class _QueryData(TypedDict):
     count: int
 
 
-GITLAB_GRAPHQL_SORTS = ["id", "name", "created", "updated", "stars"]
+GITLAB_GRAPHQL_SORTS = frozenset(("id", "name", "created", "updated", "stars"))
+GITLAB_GRAPHQL_SORT_DEFAULT = "id"
 GITLAB_GRAPHQL_SORTS_ALIASES = {
     "title": "name",
     "datetime": "updated",
@@ -701,6 +710,8 @@ class GitlabClient(ProviderClient):
         end: str | None,
     ) -> tuple[list[dict[str, Any]], CursorPagination]:
         if ids:
+            # Deduplicate while keeping order, each project is fetched once
+            ids = list(dict.fromkeys(ids))
             projects = await self._search_projects_by_ids(project_fragment, ids)
 
             # Filter-out not found
@@ -754,29 +765,18 @@ class GitlabClient(ProviderClient):
                 )
 
             if datetime_range:
-
-                def temporal_check(project_data: GitlabGraphQL_Project) -> bool:
-                    created_at = datetime.fromisoformat(project_data["createdAt"])
-                    updated_at = datetime.fromisoformat(project_data["lastActivityAt"])
-                    return (
-                        datetime_range[0] <= created_at <= datetime_range[1]
-                        or datetime_range[0] <= updated_at <= datetime_range[1]
-                        or created_at
-                        <= datetime_range[0]
-                        <= datetime_range[1]
-                        <= updated_at
-                    )
-
-                _projects_cur = [_pc for _pc in _projects_cur if temporal_check(_pc[1])]  # type: ignore[arg-type]
+                _projects_cur = [
+                    _pc
+                    for _pc in _projects_cur
+                    if _temporal_check(_pc[1], datetime_range)  # type: ignore[arg-type]
+                ]
 
             if extent:
-
-                def spatial_check(project_data: GitlabGraphQL_Project) -> bool:
-                    if project_extent := _process_spatial_extent(project_data):  # type: ignore[arg-type]
-                        return extent.intersects(project_extent)
-                    return False
-
-                _projects_cur = [_pc for _pc in _projects_cur if spatial_check(_pc[1])]  # type: ignore[arg-type]
+                _projects_cur = [
+                    _pc
+                    for _pc in _projects_cur
+                    if _spatial_check(_pc[1], extent)  # type: ignore[arg-type]
+                ]
 
             # ---------------------- #
 
@@ -1003,11 +1003,11 @@ class GitlabClient(ProviderClient):
             if sort_field not in GITLAB_GRAPHQL_SORTS:
                 sort_field = GITLAB_GRAPHQL_SORTS_ALIASES.get(
                     sort_field,
-                    GITLAB_GRAPHQL_SORTS[0],
+                    GITLAB_GRAPHQL_SORT_DEFAULT,
                 )
         else:
             sort_direction = "asc"
-            sort_field = GITLAB_GRAPHQL_SORTS[0]
+            sort_field = GITLAB_GRAPHQL_SORT_DEFAULT
         return f"{sort_field}_{sort_direction}"
 
     async def download_file(
@@ -1056,13 +1056,16 @@ class GitlabClient(ProviderClient):
         query: str,
         *,
         variables: dict[str, Any] | None = None,
+        idempotent: bool = True,
     ) -> dict[str, Any] | list[Any] | str | None:
+        # Queries are read-only and safe to retry, pass idempotent=False for mutations
         return await self._request(
             url=self.graphql_url,
             media_type="json",
             method="POST",
             headers={"Content-Type": "application/json"},
-            body=json.dumps({"query": query, "variables": variables}),
+            body=orjson.dumps({"query": query, "variables": variables}),
+            idempotent=idempotent,
         )
 
     async def _request(
@@ -1074,7 +1077,7 @@ class GitlabClient(ProviderClient):
         response = await self._send_request(url, **params)
         match media_type:
             case "json":
-                return await response.json()
+                return await response.json(loads=orjson.loads)
             case "text" | _:
                 return await response.text()
 
@@ -1145,7 +1148,7 @@ class GitlabClient(ProviderClient):
         while _url:
             response = await self._send_request(_url, request=request)
 
-            content = await response.json()
+            content = await response.json(loads=orjson.loads)
             if not isinstance(content, list):
                 raise HTTPException(
                     status_code=422,
@@ -1178,6 +1181,7 @@ class GitlabClient(ProviderClient):
         query: dict[str, Any] | None = None,
         body: str | bytes | dict | None = None,
         request: Request | None = None,
+        idempotent: bool = False,
     ) -> aiohttp.ClientResponse:
         if query is None:
             query = {}
@@ -1200,14 +1204,26 @@ class GitlabClient(ProviderClient):
         url = url_add_query_params(url, query)
         method = method.upper()
         headers = self.headers | headers
-        async with AiohttpClient() as client:
-            logger.debug(f"Request {method}: {url}")
-            response = await client.request(
-                method=method,
-                url=url,
-                headers=headers,
-                data=body,
-            )
+        retryable = idempotent or method in RETRY_METHODS
+        async with aiohttp_client as client:
+            for attempt in range(1, RETRY_MAX_ATTEMPTS + 1):
+                logger.debug(f"Request {method}: {url}")
+                response = await client.request(
+                    method=method,
+                    url=url,
+                    headers=headers,
+                    data=body,
+                )
+                if (
+                    attempt == RETRY_MAX_ATTEMPTS
+                    or not retryable
+                    or response.status not in RETRY_STATUSES
+                ):
+                    break
+                delay = _retry_delay(response, attempt)
+                response.release()
+                logger.debug(f"Retry {method}: {url} in {delay}s")
+                await asyncio.sleep(delay)
 
         if not response.ok:
             detail = (
@@ -1223,6 +1239,27 @@ class GitlabClient(ProviderClient):
         return response
 
 
+async def get_cached_user(client: GitlabClient, token: str) -> str | None:
+    """Get the username of a token, cached under the hashed token."""
+    user: str | None = await get_or_set(
+        hash_key(token),
+        client.get_user,
+        ttl=int(CHECKER_CACHE_TIMEOUT),
+        namespace="user",
+    )
+    return user
+
+
+def _retry_delay(response: aiohttp.ClientResponse, attempt: int) -> float:
+    retry_after = response.headers.get("Retry-After", "")
+    delay = (
+        float(retry_after)
+        if retry_after.isdigit()
+        else RETRY_BACKOFF * 2 ** (attempt - 1)
+    )
+    return min(delay, RETRY_MAX_DELAY)
+
+
 @no_type_check
 def _adapt_graphql_project_reference(
     project_data: GitlabGraphQL_ProjectReference,
@@ -1395,6 +1432,26 @@ def _process_readme_and_metadata(
     return readme, metadata
 
 
+def _temporal_check(
+    project_data: GitlabGraphQL_Project, datetime_range: tuple[datetime, datetime]
+) -> bool:
+    """Check if the project [createdAt, lastActivityAt] overlaps the datetime range."""
+    start, end = datetime_range
+    updated_at = datetime.fromisoformat(project_data["lastActivityAt"])
+    if updated_at < start:
+        return False
+    created_at = datetime.fromisoformat(project_data["createdAt"])
+    return created_at <= end
+
+
+def _spatial_check(
+    project_data: GitlabGraphQL_ProjectPreview, extent: BaseGeometry
+) -> bool:
+    if project_extent := _process_spatial_extent(project_data):
+        return extent.intersects(project_extent)
+    return False
+
+
 def _process_spatial_extent(
     project_data: GitlabGraphQL_ProjectPreview,
     save: bool = True,
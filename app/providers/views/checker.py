@@ -14,15 +14,16 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
-import json
+from functools import partial
 
+import orjson
 from fastapi import APIRouter, HTTPException, Response
 from starlette.status import HTTP_400_BAD_REQUEST
 
 from app.auth.depends import GitlabTokenDep
-from app.providers.client.gitlab import GitlabClient
+from app.providers.client.gitlab import GitlabClient, get_cached_user
 from app.settings import CHECKER_CACHE_TIMEOUT, GITLAB_URL
-from app.utils.cache import cache
+from app.utils.cache import get_or_set
 
 router = APIRouter()
 
@@ -37,44 +38,37 @@ async def check(
 
     gitlab_client = GitlabClient(url=GITLAB_URL, token=token.value)
 
-    user: str | None = await cache.get(token.value, namespace="user")
-    if not user:
-        user = await gitlab_client.get_user()
-        await cache.set(token.value, user, namespace="user")
+    user = await get_cached_user(gitlab_client, token.value)
 
     if project_id_or_path.isdigit():
         project_id = int(project_id_or_path)
-        project_path: str | None = await cache.get(project_id, namespace="project-path")
-        if not project_path:
-            project_path = await gitlab_client.get_project_path(id=project_id)
-            await cache.set(
-                project_id,
-                project_path,
-                ttl=int(CHECKER_CACHE_TIMEOUT),
-                namespace="project-path",
-            )
+        project_path: str = await get_or_set(
+            project_id,
+            partial(gitlab_client.get_project_path, id=project_id),
+            ttl=int(CHECKER_CACHE_TIMEOUT),
+            namespace="project-path",
+        )
     else:
         project_path = project_id_or_path
 
-    projectinfo: dict | None = await cache.get(
-        (user, project_path), namespace="project-info"
-    )
-    if not projectinfo:
+    async def _get_projectinfo() -> dict:
         project = await gitlab_client.get_project(path=project_path)
         projectinfo = project.model_dump(
             mode="json", include={"id", "name", "path", "access_level", "categories"}
         )
         projectinfo["categories"] = [c["id"] for c in projectinfo["categories"]]
-        await cache.set(
-            (user, project_path),
-            projectinfo,
-            ttl=int(CHECKER_CACHE_TIMEOUT),
-            namespace="project-info",
-        )
+        return projectinfo
+
+    projectinfo: dict = await get_or_set(
+        (user, project_path),
+        _get_projectinfo,
+        ttl=int(CHECKER_CACHE_TIMEOUT),
+        namespace="project-info",
+    )
 
     if info:
         return Response(
-            content=json.dumps(projectinfo),
+            content=orjson.dumps(projectinfo),
             media_type="application/json",
         )
     return Response()
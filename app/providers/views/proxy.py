@@ -26,7 +26,10 @@ from app.stac.api.category import get_categories
 
 router = APIRouter()
 
-_IGNORE_LIST = [*GITLAB_IGNORE_TOPICS, *(c.gitlab_topic for c in get_categories())]
+_IGNORE_TOPICS = frozenset(
+    (*GITLAB_IGNORE_TOPICS, *(c.gitlab_topic for c in get_categories()))
+)
+_TOPICS_MINIMUM_COUNT = TAGS_OPTIONS.get("gitlab", {}).get("minimum_count", 0)
 
 
 @router.get("/tags")
@@ -38,9 +41,8 @@ async def api_get_tags(
     topics_from_gitlab = [
         t
         for t in topics_from_gitlab
-        if t.name not in _IGNORE_LIST
-        and t.total_projects_count
-        >= TAGS_OPTIONS.get("gitlab", {}).get("minimum_count", 0)
+        if t.name not in _IGNORE_TOPICS
+        and t.total_projects_count >= _TOPICS_MINIMUM_COUNT
     ]
     results = {
         "topics_from_gitlab": [t.name for t in topics_from_gitlab],
@@ -14,10 +14,12 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import copy
 import logging
 import mimetypes
 import os
 import re
+from functools import lru_cache
 from pathlib import Path
 from typing import Any, TypedDict, Unpack, cast
 from urllib import parse
@@ -35,9 +37,9 @@ from app.stac.settings import (
 )
 from app.utils import geo
 from app.utils import markdown as md
-from app.utils.http import is_local, slugify, url_for
+from app.utils.http import is_local, slugify, url_for, url_template_for
 
-from .category import Category, FeatureVal
+from .category import Category, FeatureVal, get_category
 from .search import STACPagination
 
 logger = logging.getLogger("app")
@@ -58,6 +60,10 @@ MEDIA_TYPES = {
 }
 
 DOI_URL_PATTERN = re.compile(r"https://doi.org/(?P<doi>10\.\d{4,9}/[-._;/:a-zA-Z0-9]+)")
+HTML_SRC_PATTERN = re.compile(r"src=(\"|')(?P<src>.*?)(\"|')")
+COLLECTION_HREF_PATTERN = re.compile(
+    r"(?P<collection>[a-z\-]+)\+(?P<href>http[s]?://[^)]+)"
+)
 DOI_URL = "https://doi.org/"
 DOI_PREFIX = "DOI:"
 
@@ -87,16 +93,17 @@ def build_stac_root(
     )
     logo = root_config.get("logo")
 
+    collection_url = url_template_for(
+        _request,
+        "stac_collection",
+        "collection_id",
+        query={**_token.query},
+    )
     links = [
         {
             "rel": "child",
             "type": "application/geo+json",
-            "href": url_for(
-                _request,
-                "stac_collection",
-                path={"collection_id": category.id},
-                query={**_token.query},
-            ),
+            "href": collection_url.replace("{collection_id}", category.id),
         }
         for category in categories
     ]
@@ -113,6 +120,8 @@ def build_stac_root(
 
         links.append(logo_link)
 
+    root_url = url_for(_request, "stac_root", query={**_token.query})
+    base_url = url_for(_request, "@root")
     return {
         "stac_version": "1.0.0",
         "type": "Catalog",
@@ -123,31 +132,23 @@ def build_stac_root(
             {
                 "rel": "self",
                 "type": "application/json",
-                "href": url_for(
-                    _request,
-                    "stac_root",
-                    query={**_token.query},
-                ),
+                "href": root_url,
             },
             {
                 "rel": "root",
                 "type": "application/json",
-                "href": url_for(
-                    _request,
-                    "stac_root",
-                    query={**_token.query},
-                ),
+                "href": root_url,
             },
             {
                 "rel": "service-desc",
                 "type": "application/vnd.oai.openapi+json;version=3.1",
-                "href": url_for(_request, "@root") + "openapi.json",
+                "href": base_url + "openapi.json",
                 "title": "OpenAPI definition",
             },
             {
                 "rel": "service-doc",
                 "type": "text/html",
-                "href": url_for(_request, "@root") + "api/docs",
+                "href": base_url + "api/docs",
                 "title": "OpenAPI interactive docs: Swagger UI",
             },
             {
@@ -246,6 +247,51 @@ def build_stac_collection(category: Category, **context: Unpack[STACContext]) ->
     _request = context["request"]
     _token = context["token"]
 
+    # Deep copy, nested parts of the cached template must not be shared
+    template = copy.deepcopy(_build_stac_collection_template(category.id))
+    root_url = url_for(_request, "stac_root", query={**_token.query})
+    return {
+        **template,
+        "links": [
+            {
+                "rel": "self",
+                "type": "application/json",
+                "href": url_for(
+                    _request,
+                    "stac_collection",
+                    path={"collection_id": category.id},
+                    query={**_token.query},
+                ),
+            },
+            {
+                "rel": "parent",
+                "type": "application/json",
+                "href": root_url,
+            },
+            {
+                "rel": "root",
+                "type": "application/json",
+                "href": root_url,
+            },
+            {
+                "rel": "items",
+                "type": "application/geo+json",
+                "href": url_for(
+                    _request,
+                    "stac_collection_items",
+                    path={"collection_id": category.id},
+                    query={**_token.query},
+                ),
+            },
+            *template["links"],
+        ],
+    }
+
+
+@lru_cache
+def _build_stac_collection_template(category_id: str) -> dict:
+    """Build the request independent part of a category collection."""
+    category = cast(Category, get_category(category_id))
     title = category.title
     description = (
         category.description
@@ -287,47 +333,7 @@ def build_stac_collection(category: Category, **context: Unpack[STACContext]) ->
             "spatial": {"bbox": [[-180, -90, 180, 90]]},
             "temporal": {"interval": [[None, None]]},
         },
-        "links": [
-            {
-                "rel": "self",
-                "type": "application/json",
-                "href": url_for(
-                    _request,
-                    "stac_collection",
-                    path={"collection_id": category.id},
-                    query={**_token.query},
-                ),
-            },
-            {
-                "rel": "parent",
-                "type": "application/json",
-                "href": url_for(
-                    _request,
-                    "stac_root",
-                    query={**_token.query},
-                ),
-            },
-            {
-                "rel": "root",
-                "type": "application/json",
-                "href": url_for(
-                    _request,
-                    "stac_root",
-                    query={**_token.query},
-                ),
-            },
-            {
-                "rel": "items",
-                "type": "application/geo+json",
-                "href": url_for(
-                    _request,
-                    "stac_collection_items",
-                    path={"collection_id": category.id},
-                    query={**_token.query},
-                ),
-            },
-            *links,
-        ],
+        "links": links,
     }
 
 
@@ -654,59 +660,65 @@ def _build_stac_item_default_values(
     category: Category,
     **context: Unpack[STACContext],
 ) -> tuple[dict[str, str], list[dict], dict[str, dict]]:
-    _request = context["request"]
-    _token = context["token"]
-
     fields = {"collection": category.id}
     assets: dict[str, dict] = {}
+    root_url, collection_url, item_url = _get_stac_item_urls(category, **context)
     links = [
         {
             "rel": "self",
             "type": "application/geo+json",
-            "href": url_for(
-                _request,
-                "stac_collection_feature",
-                path={
-                    "collection_id": category.id,
-                    "feature_id": project.path,
-                },
-                query={**_token.query},
-            ),
+            "href": item_url.replace("{feature_id}", project.path),
         },
         {
             "rel": "parent",
             "type": "application/json",
-            "href": url_for(
-                _request,
-                "stac_collection",
-                path={"collection_id": category.id},
-                query={**_token.query},
-            ),
+            "href": collection_url,
         },
         {
             "rel": "root",
             "type": "application/json",
-            "href": url_for(
-                _request,
-                "stac_root",
-                query={**_token.query},
-            ),
+            "href": root_url,
         },
         {
             "rel": "collection",
             "type": "application/json",
-            "href": url_for(
-                _request,
-                "stac_collection",
-                path={"collection_id": category.id},
-                query={**_token.query},
-            ),
+            "href": collection_url,
         },
     ]
 
     return fields, links, assets
 
 
+def _get_stac_item_urls(
+    category: Category, **context: Unpack[STACContext]
+) -> tuple[str, str, str]:
+    """Resolve items links URLs once per request and category."""
+    _request = context["request"]
+    _token = context["token"]
+
+    items_urls = getattr(_request.state, "stac_items_urls", None)
+    if items_urls is None:
+        items_urls = _request.state.stac_items_urls = {}
+    if category.id not in items_urls:
+        collection_path = {"collection_id": category.id}
+        items_urls[category.id] = (
+            url_for(_request, "stac_root", query={**_token.query}),
+            url_for(
+                _request,
+                "stac_collection",
+                path=collection_path,
+                query={**_token.query},
+            ),
+            url_for(
+                _request,
+                "stac_collection_feature",
+                path={**collection_path, "feature_id": "{feature_id}"},
+                query={**_token.query},
+            ),
+        )
+    return items_urls[category.id]
+
+
 def _get_tags(project: ProjectReference) -> list[str]:
     project_topics = list(project.topics)
     for category in project.categories:
@@ -719,11 +731,7 @@ def _get_preview_description(project: ProjectPreview, wrap_char: int = 150) -> s
 
     if not description:
         description = project.readme
-        description = md.remove_everything_before_first_heading(description)
-        description = md.remove_headings(description)
-        description = md.remove_images(description)
-        description = md.remove_links(description)
-        description = md.clean_new_lines(description)
+        description = md.clean_markdown(description, skip_preamble=True)
         description = description[:wrap_char].strip()
         if len(description) == wrap_char:
             description += "..."
@@ -899,7 +907,7 @@ def __parse_scientific_citations(
 
     for link_text, link_href in md.get_links(md_content):
         if m := DOI_URL_PATTERN.search(link_href):
-            _doi = m.groupdict()["doi"]
+            _doi = m.group("doi")
             _citation = link_text.removeprefix(DOI_PREFIX).lstrip()
             if not doi:
                 doi = (_doi, _citation)
@@ -907,7 +915,7 @@ def __parse_scientific_citations(
                 publications.append({"doi": _doi, "citation": _citation})
 
     if not doi and (m := DOI_URL_PATTERN.search(md_content)):
-        doi = (m.groupdict()["doi"], "")
+        doi = (m.group("doi"), "")
 
     return doi, publications
 
@@ -1102,7 +1110,7 @@ def __resolve_links(
     **context: Unpack[STACContext],
 ) -> str:
     def _resolve_src(match: re.Match) -> str:
-        href = match.groupdict()["src"]
+        href = match.group("src")
         href = __resolve_href(
             href,
             project,
@@ -1112,19 +1120,18 @@ def __resolve_links(
         return f'src="{href}"'
 
     def __resolve_md(match: re.Match) -> str:
-        image = match.groupdict()
-        href = image["src"]
+        href = match.group("src")
         href = __resolve_href(
             href,
             project,
             {"cache": int(STAC_PROJECTS_CACHE_TIMEOUT)},
             **context,
         )
-        return f"![{image['alt']}]({href})"
+        return f"![{match.group('alt')}]({href})"
 
     md_patched = md_content
-    md_patched = re.sub(r"src=(\"|')(?P<src>.*?)(\"|')", _resolve_src, md_patched)
-    md_patched = re.sub(md.IMAGE_PATTERN, __resolve_md, md_patched)
+    md_patched = HTML_SRC_PATTERN.sub(_resolve_src, md_patched)
+    md_patched = md.IMAGE_PATTERN.sub(__resolve_md, md_patched)
     return md_patched
 
 
@@ -1151,13 +1158,9 @@ def __resolve_href(
             },
             query={**href_query, **_token.rc_query},
         )
-    elif match := re.search(
-        r"(?P<collection>[a-z\-]+)\+(?P<href>http[s]?://[^)]+)",
-        href,
-    ):
-        _map = match.groupdict()
-        collection = _map["collection"]
-        href_parsed = parse.urlparse(_map["href"])
+    elif match := COLLECTION_HREF_PATTERN.search(href):
+        collection = match.group("collection")
+        href_parsed = parse.urlparse(match.group("href"))
         href_query = dict(parse.parse_qsl(href_parsed.query))
         if query:
             href_query |= query
@@ -42,17 +42,21 @@ class Category(BaseModel):
     assets: list[str | dict[str, Any]] = Field(default_factory=list)
 
 
+_CATEGORIES = {
+    category_id: Category(id=category_id, **category_conf)
+    for category_id, category_conf in STAC_CATEGORIES.items()
+}
+_CATEGORIES_BY_TOPIC: dict[str, list[Category]] = {}
+for _category in _CATEGORIES.values():
+    _CATEGORIES_BY_TOPIC.setdefault(_category.gitlab_topic, []).append(_category)
+
+
 def get_category(category_id: str) -> Category | None:
-    if category_id in STAC_CATEGORIES:
-        return Category(id=category_id, **STAC_CATEGORIES[category_id])
-    return None
+    return _CATEGORIES.get(category_id)
 
 
 def get_categories() -> list[Category]:
-    return [
-        get_category_from_collection_id(collection_id)
-        for collection_id in STAC_CATEGORIES
-    ]
+    return list(_CATEGORIES.values())
 
 
 def get_category_from_collection_id(collection_id: str) -> Category:
@@ -67,7 +71,11 @@ def get_category_from_collection_id(collection_id: str) -> Category:
 
 
 def get_categories_from_topics(topics: list[str]) -> list[Category]:
-    categories = [c for c in get_categories() if c.gitlab_topic in topics]
+    categories = [
+        category
+        for topic in topics
+        for category in _CATEGORIES_BY_TOPIC.get(topic, ())
+    ]
     if not categories:
         raise HTTPException(status_code=500, detail=f"Category not found in {topics}")
     return categories
@@ -17,7 +17,7 @@
 import logging
 import re
 from datetime import datetime as dt
-from functools import cached_property
+from functools import cached_property, lru_cache
 from typing import Annotated, Any, Literal
 
 from pydantic import (
@@ -41,6 +41,11 @@ QUERY_CLEAN_PATTERN = re.compile(r"(\s){2,}")
 SearchMode = Literal["reference", "preview", "full"]
 
 
+@lru_cache(maxsize=256)
+def _parse_datetime(datetime_str: str) -> dt:
+    return dt.fromisoformat(datetime_str)
+
+
 class STACSearchSortBy(TypedDict):
     field: str
     direction: Literal["asc", "desc"]
@@ -64,28 +69,32 @@ class STACSearchQuery(BaseModel):
     def validate_datetime(cls, d: str) -> str:
         if d:
             d1, *do = d.split("/")
-            dt.fromisoformat(d1)
+            _parse_datetime(d1)
             if do:
                 d2 = do[0]
-                dt.fromisoformat(d2)
+                _parse_datetime(d2)
         return d
 
     @cached_property
     def datetime_range(self) -> tuple[dt, dt] | None:
         if self.datetime:
             start_dt_str, *other_dts_str = self.datetime.split("/")
-            start_dt = dt.fromisoformat(start_dt_str)
+            start_dt = _parse_datetime(start_dt_str)
             if other_dts_str:
                 end_dt_str = other_dts_str[0]
-                end_dt = dt.fromisoformat(end_dt_str)
+                end_dt = _parse_datetime(end_dt_str)
             else:
                 end_dt = start_dt
             return start_dt, end_dt
         return None
 
-    @field_serializer("bbox", "ids", "collections", "q", when_used="unless-none")
-    def serialize_lists(self, v: list[str | float], _info: SerializationInfo) -> str:
-        return ",".join(str(e) for e in v)
+    @field_serializer("bbox", when_used="unless-none")
+    def serialize_bbox(self, v: list[float], _info: SerializationInfo) -> str:
+        return ",".join(map(str, v))
+
+    @field_serializer("ids", "collections", "q", when_used="unless-none")
+    def serialize_lists(self, v: list[str], _info: SerializationInfo) -> str:
+        return ",".join(v)
 
 
 class STACPagination(TypedDict):
@@ -111,12 +120,10 @@ def get_state_query(
 
 def parse_stac_query(query: str) -> tuple[str | None, list[str], list[str]]:
     if query:
-        topics = [
-            m.groupdict()["topic"] for m in re.finditer(QUERY_TOPIC_PATTERN, query)
-        ]
-        flags = [m.groupdict()["flag"] for m in re.finditer(QUERY_FLAG_PATTERN, query)]
-        query = re.sub(QUERY_TOPIC_PATTERN, "", query)
-        query = re.sub(QUERY_FLAG_PATTERN, "", query)
-        query = re.sub(QUERY_CLEAN_PATTERN, " ", query).strip()
+        topics = [m.group("topic") for m in QUERY_TOPIC_PATTERN.finditer(query)]
+        flags = [m.group("flag") for m in QUERY_FLAG_PATTERN.finditer(query)]
+        query = QUERY_TOPIC_PATTERN.sub("", query)
+        query = QUERY_FLAG_PATTERN.sub("", query)
+        query = QUERY_CLEAN_PATTERN.sub(" ", query).strip()
         return query if query else None, topics, flags
     return None, [], []
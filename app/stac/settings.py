@@ -55,6 +55,12 @@ STAC_SEARCH_PAGE_DEFAULT_SIZE: int = conf(
     default=12,
     cast=int,
 )
+STAC_SEARCH_CACHE_TIMEOUT: float = conf(
+    "stac.search.cache-timeout",
+    "STAC_SEARCH_CACHE_TIMEOUT",
+    default=30.0,
+    cast=float,
+)
 
 # Extensions
 STAC_EXTENSIONS = conf("stac.extensions", default={}, cast=dict)
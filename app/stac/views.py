@@ -15,18 +15,27 @@
 # limitations under the License.
 
 import asyncio
-import json
 import logging
-from typing import Literal
+from collections.abc import Awaitable, Callable
+from functools import partial
+from typing import Literal, TypeVar
 
 import aiohttp
+import orjson
 import yaml
-from fastapi import HTTPException, Request
+from fastapi import HTTPException, Request, Response
+from fastapi.encoders import jsonable_encoder
 from fastapi.routing import APIRouter
+from starlette.concurrency import run_in_threadpool
 
 from app.auth import GitlabTokenDep
-from app.providers.client import CursorPagination, GitlabClient
-from app.providers.schemas import Project, RegisteredModel
+from app.providers.client import CursorPagination, GitlabClient, get_cached_user
+from app.providers.schemas import (
+    License,
+    Project,
+    ProjectReference,
+    RegisteredModel,
+)
 from app.settings import ENABLE_CACHE, GITLAB_URL, MLFLOW_TYPE
 from app.stac.api.category import (
     Category,
@@ -34,9 +43,15 @@ from app.stac.api.category import (
     get_categories,
     get_category,
 )
-from app.utils import geo
-from app.utils.cache import cache
-from app.utils.http import AiohttpClient, url_add_query_params, urlsafe_path
+from app.utils import SafeLoader, geo
+from app.utils.cache import cache, get_or_set, hash_key, single_flight
+from app.utils.http import (
+    aiohttp_client,
+    etag_for,
+    etag_response,
+    url_add_query_params,
+    urlsafe_path,
+)
 
 from .api.build import (
     build_features_collection,
@@ -57,9 +72,12 @@ from .api.search import (
 from .settings import (
     STAC_PROJECTS_CACHE_TIMEOUT,
     STAC_ROOT_CONF,
+    STAC_SEARCH_CACHE_TIMEOUT,
     STAC_SEARCH_PAGE_DEFAULT_SIZE,
 )
 
+ProjectT = TypeVar("ProjectT", bound=ProjectReference)
+
 logger = logging.getLogger("app")
 
 router = APIRouter()
@@ -155,16 +173,18 @@ async def stac_collection_feature(
     token: GitlabTokenDep,
     category: CategoryFromCollectionIdDep,
     feature_id: str,
-) -> dict:
+) -> Response:
     if not feature_id:
         raise HTTPException(status_code=400, detail="No feature ID given")
 
     gitlab_client = GitlabClient(url=GITLAB_URL, token=token.value)
-    project = await gitlab_client.get_project(path=feature_id)
-    user: str | None = await cache.get(token.value, namespace="user")
-    if not user:
-        user = await gitlab_client.get_user()
-        await cache.set(token.value, user, namespace="user")
+    project: Project = await single_flight(
+        ("project", hash_key(token.value), feature_id),
+        partial(gitlab_client.get_project, path=feature_id),
+    )
+    # The fetched project is shared by concurrent callers, enrich a copy
+    project = project.model_copy(deep=True)
+    user = await get_cached_user(gitlab_client, token.value)
 
     if category not in project.categories:
         raise HTTPException(
@@ -175,47 +195,58 @@ async def stac_collection_feature(
         )
 
     cache_key = ("stac", user, project.path)
-    cached_stac = await cache.get(cache_key, namespace="project")
-    if cached_stac and cached_stac["checksum"] == _get_project_checksum(project):
+    checksum = _get_project_checksum(project)
+    cached_stac: tuple[int, str, bytes] | None = await cache.get(
+        cache_key, namespace="project"
+    )
+    if cached_stac and cached_stac[0] == checksum:
         logger.debug(
             f"Read project stac from cache '{project.path}' (no changes detected)",
         )
-        await cache.set(
-            cache_key,
-            cached_stac,
-            ttl=int(STAC_PROJECTS_CACHE_TIMEOUT),
-            namespace="project",
+        # Keep hot items cached, only the TTL is refreshed
+        await cache.expire(
+            cache_key, int(STAC_PROJECTS_CACHE_TIMEOUT), namespace="project"
+        )
+        _, etag, project_stac = cached_stac
+        return etag_response(request, project_stac, etag)
+
+    async def _build_project_stac() -> tuple[str, bytes]:
+        await asyncio.gather(
+            _resolve_license(project, gitlab_client),
+            _collect_containers_tags(project, gitlab_client),
+            _collect_registered_models(
+                project,
+                mlflow_type=MLFLOW_TYPE,
+                auth_token=token.value,
+            ),
         )
-        return cached_stac["stac"]
-
-    await _resolve_license(project, gitlab_client)
-    await _collect_containers_tags(project, gitlab_client)
-    await _collect_registered_models(
-        project,
-        mlflow_type=MLFLOW_TYPE,
-        auth_token=token.value,
-    )
 
-    project_stac = build_stac_item(
-        project=project,
-        category=category,
-        request=request,
-        token=token,
-    )
-    if ENABLE_CACHE:
-        logger.debug(f"Write stac '{feature_id}' in cache")
-        cached_stac = {
-            "checksum": _get_project_checksum(project),
-            "stac": project_stac,
-        }
-        await cache.set(
-            cache_key,
-            cached_stac,
-            ttl=int(STAC_PROJECTS_CACHE_TIMEOUT),
-            namespace="project",
+        stac_item = await run_in_threadpool(
+            build_stac_item,
+            project=project,
+            category=category,
+            request=request,
+            token=token,
         )
+        project_stac = orjson.dumps(jsonable_encoder(stac_item))
+        etag = etag_for(project_stac)
+        if ENABLE_CACHE:
+            logger.debug(f"Write stac '{feature_id}' in cache")
+            await cache.set(
+                cache_key,
+                (checksum, etag, project_stac),
+                ttl=int(STAC_PROJECTS_CACHE_TIMEOUT),
+                namespace="project",
+            )
+        return etag, project_stac
 
-    return project_stac
+    # Concurrent requests for the same unchanged project share one build, only
+    # within the same token and base URL since both end up in the item links
+    etag, project_stac = await single_flight(
+        (*cache_key, checksum, hash_key(token.value), str(request.base_url)),
+        _build_project_stac,
+    )
+    return etag_response(request, project_stac, etag)
 
 
 def _get_project_checksum(project: Project) -> int:
@@ -243,7 +274,7 @@ async def stac_search_get(
         sortby=sortby,
         bbox=[float(p) for p in bbox.split(",")] if bbox else [],
         datetime=datetime if datetime else None,
-        intersects=json.loads(intersects),
+        intersects=orjson.loads(intersects),
         ids=ids.split(",") if ids else [],
         collections=collections.split(",") if collections else [],
         q=q.split(",") if q else [],
@@ -359,17 +390,38 @@ async def _stac_search(  # noqa: C901
     else:
         extent = None
 
+    _check_datetime_range(search_query)
+
+    search_key = (
+        hash_key(token.value),
+        mode,
+        tuple(search_query.ids),
+        query,
+        tuple(topics),
+        tuple(flags),
+        extent.wkt if extent else None,
+        search_query.datetime_range,
+        search_query.limit,
+        sortby,
+        after,
+        before,
+    )
+
     match mode:
         case "reference":
-            projects_refs, _pagination = await gitlab_client.search_references(
-                ids=search_query.ids,
-                query=query,
-                topics=topics,
-                flags=flags,
-                limit=search_query.limit,
-                sort=sortby,
-                start=after,
-                end=before,
+            projects_refs, _pagination = await _cached_search(
+                search_key,
+                partial(
+                    gitlab_client.search_references,
+                    ids=search_query.ids,
+                    query=query,
+                    topics=topics,
+                    flags=flags,
+                    limit=search_query.limit,
+                    sort=sortby,
+                    start=after,
+                    end=before,
+                ),
             )
             count = len(projects_refs)
             features = [
@@ -377,17 +429,21 @@ async def _stac_search(  # noqa: C901
                 for p in projects_refs
             ]
         case "preview":
-            projects_prevs, _pagination = await gitlab_client.search_previews(
-                ids=search_query.ids,
-                query=query,
-                topics=topics,
-                flags=flags,
-                extent=extent,
-                datetime_range=search_query.datetime_range,
-                limit=search_query.limit,
-                sort=sortby,
-                start=after,
-                end=before,
+            projects_prevs, _pagination = await _cached_search(
+                search_key,
+                partial(
+                    gitlab_client.search_previews,
+                    ids=search_query.ids,
+                    query=query,
+                    topics=topics,
+                    flags=flags,
+                    extent=extent,
+                    datetime_range=search_query.datetime_range,
+                    limit=search_query.limit,
+                    sort=sortby,
+                    start=after,
+                    end=before,
+                ),
             )
             count = len(projects_prevs)
             features = [
@@ -395,17 +451,21 @@ async def _stac_search(  # noqa: C901
                 for p in projects_prevs
             ]
         case "full":
-            projects, _pagination = await gitlab_client.search(
-                ids=search_query.ids,
-                query=query,
-                topics=topics,
-                flags=flags,
-                extent=extent,
-                datetime_range=search_query.datetime_range,
-                limit=search_query.limit,
-                sort=sortby,
-                start=after,
-                end=before,
+            projects, _pagination = await _cached_search(
+                search_key,
+                partial(
+                    gitlab_client.search,
+                    ids=search_query.ids,
+                    query=query,
+                    topics=topics,
+                    flags=flags,
+                    extent=extent,
+                    datetime_range=search_query.datetime_range,
+                    limit=search_query.limit,
+                    sort=sortby,
+                    start=after,
+                    end=before,
+                ),
             )
             count = len(projects)
             await asyncio.gather(
@@ -420,10 +480,12 @@ async def _stac_search(  # noqa: C901
                     for p in projects
                 ),
             )
-            features = [
-                build_stac_item(p, category, request=request, token=token)
-                for p in projects
-            ]
+            features = await run_in_threadpool(
+                lambda: [
+                    build_stac_item(p, category, request=request, token=token)
+                    for p in projects
+                ]
+            )
     pagination = _create_stac_pagination(
         _pagination,
         limit=search_query.limit,
@@ -443,6 +505,35 @@ async def _stac_search(  # noqa: C901
     )
 
 
+def _check_datetime_range(search_query: STACSearchQuery) -> None:
+    if datetime_range := search_query.datetime_range:
+        try:
+            reversed_range = datetime_range[0] > datetime_range[1]
+        except TypeError:  # naive and aware datetimes mixed
+            reversed_range = True
+        if reversed_range:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Invalid 'datetime' interval: {search_query.datetime}",
+            )
+
+
+async def _cached_search(
+    key: tuple,
+    search: Callable[[], Awaitable[tuple[list[ProjectT], CursorPagination]]],
+) -> tuple[list[ProjectT], CursorPagination]:
+    if not ENABLE_CACHE:
+        return await search()
+    projects, pagination = await get_or_set(
+        key,
+        search,
+        namespace="search",
+        ttl=int(STAC_SEARCH_CACHE_TIMEOUT),
+    )
+    # Cached projects are shared, callers get copies they can enrich
+    return [p.model_copy(deep=True) for p in projects], pagination
+
+
 def _create_stac_pagination(
     cursor_pagination: CursorPagination,
     limit: int,
@@ -461,23 +552,26 @@ async def _resolve_license(project: Project, client: GitlabClient) -> None:
     cache_key = project.path
     nolicense = 1
 
-    license_ = await cache.get(cache_key, namespace="license")
-    if not license_:
-        license_ = await client.get_license(project)
-        await cache.set(
-            cache_key,
-            license_ if license_ else nolicense,
-            namespace="license",
-            ttl=int(STAC_PROJECTS_CACHE_TIMEOUT),
-        )
+    async def _get_license() -> License | int:
+        return await client.get_license(project) or nolicense
+
+    license_ = await get_or_set(
+        cache_key,
+        _get_license,
+        namespace="license",
+        ttl=int(STAC_PROJECTS_CACHE_TIMEOUT),
+    )
 
     if license_ and license_ != nolicense:
         project.license = license_
 
 
 async def _collect_containers_tags(project: Project, client: GitlabClient) -> None:
-    for container in project.containers:
-        container.tags = await client.get_container_tags(container)
+    containers_tags = await asyncio.gather(
+        *(client.get_container_tags(container) for container in project.containers)
+    )
+    for container, tags in zip(project.containers, containers_tags, strict=True):
+        container.tags = tags
 
 
 async def _collect_registered_models(
@@ -504,21 +598,38 @@ async def _get_registered_models(
     headers = {"Authorization": f"Bearer {auth_token}"}
 
     registered_models: list[RegisteredModel] = []
-    async with AiohttpClient() as client:
+    async with aiohttp_client as client:
         search_req = await client.get(
             url=mlflow_api_url + "/registered-models/search", headers=headers
         )
         if not search_req.ok:
             return registered_models
 
-        search_data = await search_req.json()
+        search_data = await search_req.json(loads=orjson.loads)
         all_registered_models = search_data.get("registered_models", [])
-        for rm_data in all_registered_models:
-            # Read latest version metadata
-            latest_versions = rm_data.get("latest_versions", [])
-            if not latest_versions:
+        # Read latest version metadata
+        latest_versions = [
+            rm_data["latest_versions"][0]
+            for rm_data in all_registered_models
+            if rm_data.get("latest_versions")
+        ]
+        models_artifact_paths = await asyncio.gather(
+            *(
+                _get_model_artifact_path(
+                    mlflow_url=mlflow_url,
+                    mlflow_run=latest_version["run_id"],
+                    mlflow_source=latest_version["source"],
+                    client=client,
+                    headers=headers,
+                )
+                for latest_version in latest_versions
+            )
+        )
+        for latest_version, model_artifact_path in zip(
+            latest_versions, models_artifact_paths, strict=True
+        ):
+            if not model_artifact_path:
                 continue
-            latest_version = latest_versions[0]
 
             # Determine model informations
             model_name = latest_version["name"]
@@ -530,16 +641,6 @@ async def _get_registered_models(
                 f"{urlsafe_path(model_name)}/versions/{model_version}"
             )
 
-            model_artifact_path = await _get_model_artifact_path(
-                mlflow_url=mlflow_url,
-                mlflow_run=mlflow_run,
-                mlflow_source=latest_version["source"],
-                client=client,
-                headers=headers,
-            )
-            if not model_artifact_path:
-                continue
-
             registered_models.append(
                 RegisteredModel(
                     name=model_name,
@@ -580,7 +681,7 @@ async def _get_model_artifact_path(
     if not model_metadata_req.ok:
         return None
     model_metadata_content = await model_metadata_req.text()
-    model_metadata = yaml.load(model_metadata_content, Loader=yaml.SafeLoader)
+    model_metadata = yaml.load(model_metadata_content, Loader=SafeLoader)
 
     python_flavor = model_metadata.get("flavors", {}).get("python_function", {})
     if not python_flavor:
@@ -39,6 +39,12 @@ S3_UPLOAD_CHUNK_SIZE: int = conf(
     default=6000000,
     cast=int,
 )
+S3_UPLOAD_CONCURRENCY: int = conf(
+    "s3.upload-concurrency",
+    "S3_UPLOAD_CONCURRENCY",
+    default=4,
+    cast=int,
+)
 S3_FEATURE_NAME = "store-s3"
 S3_CHECK_ACCESS_CACHE_TIMEOUT: float = conf(
     "s3.check-access.cache-timeout",
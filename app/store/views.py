@@ -14,23 +14,25 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import asyncio
 import logging
-from io import BytesIO
+from functools import partial
 from typing import Annotated
 
 import boto3
 from botocore.exceptions import BotoCoreError, ClientError
 from fastapi import APIRouter, HTTPException, Path, Request
-from fastapi.responses import JSONResponse, RedirectResponse
+from fastapi.responses import ORJSONResponse, RedirectResponse
+from starlette.concurrency import run_in_threadpool
 from starlette.status import HTTP_403_FORBIDDEN
 
 from app.auth import GitlabTokenDep
 from app.auth.api import GitlabToken
-from app.providers.client.gitlab import GitlabClient
+from app.providers.client.gitlab import GitlabClient, get_cached_user
 from app.providers.schemas import AccessLevel
-from app.settings import CHECKER_CACHE_TIMEOUT, GITLAB_URL
+from app.settings import CHECKER_CACHE_TIMEOUT, ENABLE_CACHE, GITLAB_URL
 from app.stac.api.category import FeatureVal
-from app.utils.cache import cache
+from app.utils.cache import get_or_set
 
 from .settings import (
     S3_ACCESS_KEY,
@@ -42,8 +44,11 @@ from .settings import (
     S3_REGION_NAME,
     S3_SECRET_KEY,
     S3_UPLOAD_CHUNK_SIZE,
+    S3_UPLOAD_CONCURRENCY,
 )
 
+_PRESIGNED_URL_CACHE_TIMEOUT = S3_PRESIGNED_EXPIRATION // 2
+
 logger = logging.getLogger("app")
 
 router = APIRouter()
@@ -61,25 +66,15 @@ s3_client = boto3.client(
 async def check_access(token: GitlabToken, project_id: int) -> None:
     """Checks the access permissions for a given Gitlab user token and project ID."""
     gitlab_client = GitlabClient(url=GITLAB_URL, token=token.value)
-    user: str | None = await cache.get(token.value, namespace="user")
-    if not user:
-        user = await gitlab_client.get_user()
-        await cache.set(token.value, user, namespace="user")
-
-    project_path: str | None = await cache.get(project_id, namespace="project-path")
-    if not project_path:
-        project_path = await gitlab_client.get_project_path(id=project_id)
-        await cache.set(
-            project_id,
-            project_path,
-            ttl=int(CHECKER_CACHE_TIMEOUT),
-            namespace="project-path",
-        )
-
-    has_access: bool | None = await cache.get(
-        (user, project_path), namespace="project-access"
+    user = await get_cached_user(gitlab_client, token.value)
+    project_path: str = await get_or_set(
+        project_id,
+        partial(gitlab_client.get_project_path, id=project_id),
+        ttl=int(CHECKER_CACHE_TIMEOUT),
+        namespace="project-path",
     )
-    if has_access is None:
+
+    async def _get_access() -> bool:
         project = await gitlab_client.get_project(project_path)
         if any(
             c.features.get(S3_FEATURE_NAME, FeatureVal.DISABLE) != FeatureVal.ENABLE
@@ -89,13 +84,14 @@ async def check_access(token: GitlabToken, project_id: int) -> None:
                 status_code=HTTP_403_FORBIDDEN,
                 detail="S3 store is not enabled for this project's category",
             )
-        has_access = project.access_level >= AccessLevel.CONTRIBUTOR
-        await cache.set(
-            (user, project_path),
-            has_access,
-            ttl=int(S3_CHECK_ACCESS_CACHE_TIMEOUT),
-            namespace="project-access",
-        )
+        return project.access_level >= AccessLevel.CONTRIBUTOR
+
+    has_access: bool = await get_or_set(
+        (user, project_path),
+        _get_access,
+        ttl=int(S3_CHECK_ACCESS_CACHE_TIMEOUT),
+        namespace="project-access",
+    )
 
     if not has_access:
         raise HTTPException(
@@ -104,6 +100,32 @@ async def check_access(token: GitlabToken, project_id: int) -> None:
         )
 
 
+async def _generate_presigned_url(client_method: str, params: dict) -> str:
+    """Generate a presigned URL, reused for half of its validity period."""
+    presign = partial(
+        run_in_threadpool,
+        s3_client.generate_presigned_url,
+        ClientMethod=client_method,
+        Params=params,
+        ExpiresIn=S3_PRESIGNED_EXPIRATION,
+    )
+    if not ENABLE_CACHE or not _PRESIGNED_URL_CACHE_TIMEOUT:
+        return await presign()
+    return await get_or_set(
+        (
+            client_method,
+            params["Bucket"],
+            params["Key"],
+            params.get("ContentType"),
+            params.get("PartNumber"),
+            params.get("UploadId"),
+        ),
+        presign,
+        ttl=_PRESIGNED_URL_CACHE_TIMEOUT,
+        namespace="presigned-url",
+    )
+
+
 @router.api_route(
     "/{project_id}/{path:path}",
     methods=["PUT", "GET", "HEAD"],
@@ -120,20 +142,18 @@ async def s3_get_proxy(
     try:
         s3_path = f"{project_id}/{path}"
         if request.method in ["PUT"]:
-            response = s3_client.generate_presigned_url(
-                ClientMethod="put_object",
-                Params={
+            response = await _generate_presigned_url(
+                "put_object",
+                {
                     "Bucket": S3_BUCKET,
                     "Key": s3_path,
                     "ContentType": "application/octet-stream",
                 },
-                ExpiresIn=S3_PRESIGNED_EXPIRATION,
             )
         else:
-            response = s3_client.generate_presigned_url(
+            response = await _generate_presigned_url(
                 "get_object",
-                Params={"Bucket": S3_BUCKET, "Key": s3_path},
-                ExpiresIn=S3_PRESIGNED_EXPIRATION,
+                {"Bucket": S3_BUCKET, "Key": s3_path},
             )
     except ClientError as e:
         detail = f"AWS S3 Client Error: {e}"
@@ -151,57 +171,64 @@ async def s3_post_proxy(
     path: Annotated[str, Path(title="The path of the item to get")],
     request: Request,
     token: GitlabTokenDep,
-) -> JSONResponse:
+) -> ORJSONResponse:
     await check_access(token, project_id)
 
+    uploads: set[asyncio.Task] = set()
     try:
         s3_path = f"{project_id}/{path}"
-        byte_buffer = BytesIO()
+        buffer = bytearray()
 
         # Stream the file directly to S3 without loading it entirely into memory
-        mpu = s3_client.create_multipart_upload(Bucket=S3_BUCKET, Key=s3_path)
+        mpu = await run_in_threadpool(
+            s3_client.create_multipart_upload, Bucket=S3_BUCKET, Key=s3_path
+        )
         upload_id = mpu["UploadId"]
-        part_number = 1
-        parts = []
-        byte_buffer_size = 0
-        async for chunk in request.stream():
-            byte_buffer.write(chunk)
-            byte_buffer_size += len(chunk)
-            if byte_buffer_size > S3_UPLOAD_CHUNK_SIZE:
-                byte_buffer.seek(0)
-                part = s3_client.upload_part(
-                    Bucket=S3_BUCKET,
-                    Key=s3_path,
-                    PartNumber=part_number,
-                    UploadId=upload_id,
-                    Body=byte_buffer.read(byte_buffer_size),
-                )
-                parts.append({"PartNumber": part_number, "ETag": part["ETag"]})
-                part_number += 1
-                byte_buffer.seek(0)
-                byte_buffer_size = 0
 
-        if byte_buffer_size > 0:
-            byte_buffer.seek(0)
-            part = s3_client.upload_part(
+        async def _upload_part(part_number: int, body: bytes) -> dict:
+            part = await run_in_threadpool(
+                s3_client.upload_part,
                 Bucket=S3_BUCKET,
                 Key=s3_path,
                 PartNumber=part_number,
                 UploadId=upload_id,
-                Body=byte_buffer.read(byte_buffer_size),
+                Body=body,
             )
-            parts.append({"PartNumber": part_number, "ETag": part["ETag"]})
+            return {"PartNumber": part_number, "ETag": part["ETag"]}
+
+        part_number = 1
+        parts = []
+        async for chunk in request.stream():
+            buffer += chunk
+            if len(buffer) > S3_UPLOAD_CHUNK_SIZE:
+                # Keep receiving while previous parts are being sent
+                if len(uploads) >= S3_UPLOAD_CONCURRENCY:
+                    done, uploads = await asyncio.wait(
+                        uploads, return_when=asyncio.FIRST_COMPLETED
+                    )
+                    parts.extend(task.result() for task in done)
+                body = bytes(buffer)
+                uploads.add(asyncio.create_task(_upload_part(part_number, body)))
+                part_number += 1
+                buffer.clear()
+
+        if buffer:
+            body = bytes(buffer)
+            uploads.add(asyncio.create_task(_upload_part(part_number, body)))
 
+        parts.extend(await asyncio.gather(*uploads))
+        parts.sort(key=lambda part: part["PartNumber"])
         part_info = {"Parts": parts}
 
-        s3_client.complete_multipart_upload(
+        await run_in_threadpool(
+            s3_client.complete_multipart_upload,
             Bucket=S3_BUCKET,
             Key=s3_path,
-            UploadId=mpu["UploadId"],
+            UploadId=upload_id,
             MultipartUpload=part_info,
         )
 
-        return JSONResponse(
+        return ORJSONResponse(
             content={"message": "File uploaded successfully"},
             status_code=200,
         )
@@ -212,3 +239,6 @@ async def s3_post_proxy(
     except ClientError as e:
         detail = f"AWS S3 Client Error: {e}"
         raise HTTPException(status_code=500, detail=detail) from e
+    finally:
+        for task in uploads:
+            task.cancel()
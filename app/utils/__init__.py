@@ -14,18 +14,10 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
-from typing import Any
-
-
-def singleton(cls: type) -> object:
-    instances = {}
-
-    def getinstance(*args: Any, **kwargs: Any) -> object:
-        if cls not in instances:
-            instances[cls] = cls(*args, **kwargs)
-        return instances[cls]
-
-    return getinstance
+try:
+    from yaml import CSafeLoader as SafeLoader
+except ImportError:  # pragma: no cover
+    from yaml import SafeLoader  # type: ignore[assignment]
 
 
 def merge(a: dict, b: dict) -> dict:
@@ -14,6 +14,51 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import asyncio
+import hashlib
+from collections.abc import Awaitable, Callable, Hashable
+from typing import Any
+
 from aiocache import Cache
+from aiocache.lock import RedLock
+
+CACHE_LOCK_LEASE = 10
 
 cache = Cache()
+
+_inflight: dict[Hashable, asyncio.Future] = {}
+
+
+def hash_key(secret: str) -> str:
+    """Digest a secret, such as a token, to use it as a cache key."""
+    return hashlib.blake2b(secret.encode(), digest_size=16).hexdigest()
+
+
+async def get_or_set(
+    key: Hashable,
+    factory: Callable[[], Awaitable[Any]],
+    *,
+    namespace: str,
+    ttl: int | None = None,
+) -> Any:  # noqa: ANN401
+    """Get a cached value, computing it only once for concurrent misses."""
+    value = await cache.get(key, namespace=namespace)
+    if value is None:
+        async with RedLock(cache, f"{namespace}:{key}", lease=CACHE_LOCK_LEASE):
+            value = await cache.get(key, namespace=namespace)
+            if value is None:
+                value = await factory()
+                await cache.set(key, value, ttl=ttl, namespace=namespace)
+    return value
+
+
+async def single_flight(
+    key: Hashable,
+    factory: Callable[[], Awaitable[Any]],
+) -> Any:  # noqa: ANN401
+    """Share the result of an in-flight call with concurrent callers of the same key."""
+    future = _inflight.get(key)
+    if future is None:
+        future = _inflight[key] = asyncio.ensure_future(factory())
+        future.add_done_callback(lambda _: _inflight.pop(key, None))
+    return await asyncio.shield(future)
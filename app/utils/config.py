@@ -14,20 +14,22 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
-import json
+import contextlib
 import os
 from collections.abc import Callable
-from dataclasses import dataclass
+from functools import partial
 from pathlib import Path
 from typing import Any
 
+import orjson
 import yaml
 
-from app.utils import merge
+from app.utils import SafeLoader, merge
 
 
-@dataclass
 class Config:
+    __slots__ = ("_flat", "files", "mapping", "secret_dir")
+
     def __init__(
         self,
         mapping: dict,
@@ -37,18 +39,21 @@ class Config:
         self.mapping = mapping
         self.files = files if files else []
         self.secret_dir = Path(secret_dir) if secret_dir else Path.cwd()
+        self._flat = _flatten(mapping)
 
     @staticmethod
     def load(*files: str, **kwargs: Any) -> "Config":
         mapping: dict = {}
         _files = []
         for file_path in files:
-            if os.path.isfile(file_path):
-                _files.append(os.path.realpath(file_path))
-                with open(file_path) as f:
-                    _content = yaml.load(f, Loader=yaml.SafeLoader)
-                if isinstance(_content, dict):
-                    mapping = merge(mapping, _content)
+            try:
+                with open(file_path, "rb") as f:
+                    _content = yaml.load(f, Loader=SafeLoader)
+            except (FileNotFoundError, IsADirectoryError):
+                continue
+            _files.append(os.path.realpath(file_path))
+            if isinstance(_content, dict):
+                mapping = merge(mapping, _content)
         return Config(mapping, files=_files, **kwargs)
 
     def __call__(
@@ -60,24 +65,12 @@ class Config:
         default: Any = None,  # noqa: ANN401
         cast: Callable[[Any], Any] | None = None,
     ) -> Any:  # noqa: ANN401
-        val = None
-        cursor: Any = self.mapping
-
-        if path:
-            paths = path.split(".")
-            for i, p in enumerate(paths):
-                cursor = cursor.get(p)
-                if i == len(paths) - 1:
-                    val = cursor
-                if cursor is None or not isinstance(cursor, dict):
-                    break
+        val = self._flat.get(path) if path else None
         if env_var:
             val = os.environ.get(env_var, val)
         if file_name:
-            file_path = self.secret_dir / file_name
-            if file_path.is_file():
-                with file_path.open() as f:
-                    val = f.read().strip()
+            with contextlib.suppress(FileNotFoundError, IsADirectoryError):
+                val = (self.secret_dir / file_name).read_text().strip()
 
         if val is None:
             val = default
@@ -86,12 +79,25 @@ class Config:
         return val
 
 
+def _flatten(mapping: dict, prefix: str = "") -> dict[str, Any]:
+    flat: dict[str, Any] = {}
+    for key, value in mapping.items():
+        path = f"{prefix}{key}"
+        flat[path] = value
+        if isinstance(value, dict):
+            flat |= _flatten(value, prefix=f"{path}.")
+    return flat
+
+
+_TRUE_VALUES = frozenset(("true", "1"))
+
+
 def cbool() -> Callable[[Any], bool]:
-    return lambda v: str(v).lower() in ["true", "1"]
+    return lambda v: str(v).lower() in _TRUE_VALUES
 
 
 def clist(*, sep: str = ",") -> Callable[[str], list[str]]:
-    return lambda v: v if isinstance(v, list) else v.split(sep)
+    return partial(_to_list, sep)
 
 
 def cpath() -> Callable[[str | Path], Path]:
@@ -99,10 +105,16 @@ def cpath() -> Callable[[str | Path], Path]:
 
 
 def cdict(*, sep: str = ",") -> Callable[[str], dict]:
-    return lambda v: (
-        dict(e.split(":", 1) for e in v.split(sep)) if isinstance(v, str) else v
-    )
+    return partial(_to_dict, sep)
+
+
+def cjson() -> Callable[[str | bytes], dict | list | None]:
+    return lambda v: orjson.loads(v) if isinstance(v, str | bytes) else v
+
+
+def _to_list(sep: str, v: str | list[str]) -> list[str]:
+    return v if isinstance(v, list) else v.split(sep)
 
 
-def cjson() -> Callable[[str], dict | list | None]:
-    return lambda v: json.loads(v) if isinstance(v, str) else v
+def _to_dict(sep: str, v: str | dict) -> dict:
+    return dict(e.split(":", 1) for e in v.split(sep)) if isinstance(v, str) else v
@@ -14,16 +14,20 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import hashlib
 import re
 from enum import StrEnum, auto
+from functools import lru_cache
 from socket import AF_INET
 from typing import Any
 from urllib.parse import parse_qsl, quote, urlencode, urlparse, urlunparse
 
 import aiohttp
-from fastapi import Request
+from fastapi import Request, Response
 
-from app.utils import singleton
+SLUG_INVALID_CHARS_PATTERN = re.compile(r"[^\w\s-]")
+SLUG_SEPARATORS_PATTERN = re.compile(r"[\s_-]+")
+SLUG_TRIM_PATTERN = re.compile(r"^-+|-+$")
 
 
 class HttpMethod(StrEnum):
@@ -61,14 +65,38 @@ def url_for(
     return url
 
 
+def url_template_for(
+    request: Request,
+    name: str,
+    param: str,
+    query: dict[str, Any] | None = None,
+) -> str:
+    """Resolve route URL once, leaving `{param}` to be replaced by the caller."""
+    return url_for(request, name, path={param: f"{{{param}}}"}, query=query)
+
+
+def etag_for(content: bytes) -> str:
+    return f'W/"{hashlib.blake2b(content, digest_size=16).hexdigest()}"'
+
+
+def etag_response(request: Request, content: bytes, etag: str) -> Response:
+    """Create a JSON response, or a 304 if the client already has this `etag`."""
+    headers = {"ETag": etag}
+    if_none_match = request.headers.get("If-None-Match", "")
+    if etag in (tag.strip() for tag in if_none_match.split(",")):
+        return Response(status_code=304, headers=headers)
+    return Response(content=content, media_type="application/json", headers=headers)
+
+
 def slugify(s: str) -> str:
     s = s.lower().strip()
-    s = re.sub(r"[^\w\s-]", "", s)
-    s = re.sub(r"[\s_-]+", "-", s)
-    s = re.sub(r"^-+|-+$", "", s)
+    s = SLUG_INVALID_CHARS_PATTERN.sub("", s)
+    s = SLUG_SEPARATORS_PATTERN.sub("-", s)
+    s = SLUG_TRIM_PATTERN.sub("", s)
     return s
 
 
+@lru_cache(maxsize=1024)
 def clean_url(url: str, trailing_slash: bool = True) -> str:
     u = urlparse(url)
     if u.scheme in ["http", "https"] and u.netloc:
@@ -77,10 +105,14 @@ def clean_url(url: str, trailing_slash: bool = True) -> str:
     raise ValueError(msg)
 
 
+@lru_cache(maxsize=1024)
 def is_local(uri: str) -> bool:
+    if uri.startswith(("http://", "https://")):
+        return False
     return urlparse(uri).scheme in ("file", "")
 
 
+@lru_cache(maxsize=1024)
 def url_domain(url: str | None) -> str | None:
     if domain := urlparse(url).netloc:
         if isinstance(domain, bytes):
@@ -94,14 +126,17 @@ def urlsafe_path(path: str) -> str:
 
 
 def url_add_query_params(url: str, query_params: dict) -> str:
+    if "?" not in url and "#" not in url:
+        return f"{url}?{urlencode(query_params)}" if query_params else url
     url_parts = list(urlparse(url))
     url_parts[4] = urlencode(dict(parse_qsl(url_parts[4])) | query_params)
     return urlunparse(url_parts)
 
 
-@singleton
 class AiohttpClient:
     SIZE_POOL_AIOHTTP = 100
+    DNS_CACHE_TTL = 300
+    KEEPALIVE_TIMEOUT = 75.0
 
     def __init__(self) -> None:
         self.client: aiohttp.ClientSession | None = None
@@ -110,9 +145,18 @@ class AiohttpClient:
         client_timeout = aiohttp.ClientTimeout(total=timeout if timeout else None)
         connector = aiohttp.TCPConnector(
             family=AF_INET,
+            limit=0,
             limit_per_host=self.SIZE_POOL_AIOHTTP,
+            use_dns_cache=True,
+            ttl_dns_cache=self.DNS_CACHE_TTL,
+            keepalive_timeout=self.KEEPALIVE_TIMEOUT,
+        )
+        self.client = aiohttp.ClientSession(
+            timeout=client_timeout,
+            connector=connector,
+            connector_owner=True,
+            trust_env=False,
         )
-        self.client = aiohttp.ClientSession(timeout=client_timeout, connector=connector)
 
     async def close(self) -> None:
         if self.client:
@@ -127,3 +171,6 @@ class AiohttpClient:
 
     async def __aexit__(self, *exc: object) -> bool:
         return False
+
+
+aiohttp_client = AiohttpClient()
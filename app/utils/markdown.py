@@ -15,83 +15,79 @@
 # limitations under the License.
 
 import re
-from functools import cache
+from functools import lru_cache
 from typing import cast
 
-import markdown
-from yaml.scanner import ScannerError
+import yaml
+
+from . import SafeLoader
 
 HEADING_PATTERN = re.compile(r"(#{1,6})\s+(?P<title>.*)", flags=re.MULTILINE)
 IMAGE_PATTERN = re.compile(r"!\[(?P<alt>.*?)\]\((?P<src>.*?)\)")
-LINK_PATTERN = re.compile(r"(?<!\!)\[(?P<text>[^\]]*)\]\((?P<href>http[s]?://[^)]+)\)")
+LINK_PATTERN = re.compile(
+    r"(?<!\!)\[(?P<text>[^\]]*+)\]\((?P<href>https?+://[^)]++)\)"
+)
 EMPTY_LINES_PATTERN = re.compile(r"(\n){3,}")
+FRONT_MATTER_PATTERN = re.compile(
+    r"\A---[ \t]*\n(?:(?P<yaml>.*?)\n)?(?:---|\.\.\.)[ \t]*(?:\n|\Z)",
+    flags=re.DOTALL,
+)
+STRIP_PATTERN = re.compile(
+    rf"{HEADING_PATTERN.pattern}|{IMAGE_PATTERN.pattern}",
+    flags=re.MULTILINE,
+)
 
 
 def parse(markdown_content: str) -> tuple[str, dict]:
+    front_matter = FRONT_MATTER_PATTERN.match(markdown_content)
+    if not front_matter:
+        return markdown_content, {}
+
     try:
-        md = markdown.Markdown(extensions=["full_yaml_metadata"])
-        md.convert(markdown_content)
-        metadata = cast(dict, md.Meta if md.Meta else {})  # type: ignore[attr-defined]
-    except ScannerError:
-        metadata = {}
-    if markdown_content.startswith("---"):
-        doc = markdown_content.split("---", 2)[-1].lstrip()
-    else:
-        doc = markdown_content
-    return doc, metadata
-
-
-@cache
+        metadata = yaml.load(front_matter.group("yaml") or "", Loader=SafeLoader)
+    except yaml.YAMLError:
+        metadata = None
+    doc = markdown_content[front_matter.end() :].lstrip()
+    return doc, metadata if isinstance(metadata, dict) else {}
+
+
+@lru_cache(maxsize=256)
 def get_images(markdown_content: str) -> list[tuple[str, str]]:
     images = []
-    for match_ in re.finditer(IMAGE_PATTERN, markdown_content):
-        match_data = match_.groupdict()
-        img_alt = match_data.get("alt", "").strip()
-        img_src = match_data.get("src", "").strip()
+    for match_ in IMAGE_PATTERN.finditer(markdown_content):
+        img_alt = match_.group("alt").strip()
+        img_src = match_.group("src").strip()
         if all((img_alt, img_src)):
             images.append((img_alt, img_src))
     return images
 
 
-@cache
+@lru_cache(maxsize=256)
 def get_links(markdown_content: str) -> list[tuple[str, str]]:
     links = []
-    for match_ in re.finditer(LINK_PATTERN, markdown_content):
-        match_data = match_.groupdict()
-        link_text = match_data.get("text", "").strip()
-        link_href = match_data.get("href", "").strip()
+    for match_ in LINK_PATTERN.finditer(markdown_content):
+        link_text = match_.group("text").strip()
+        link_href = match_.group("href").strip()
         if all((link_text, link_href)):
             links.append((link_text, link_href))
     return links
 
 
-@cache
-def remove_images(markdown_content: str) -> str:
-    return re.sub(IMAGE_PATTERN, "", markdown_content)
-
-
-@cache
-def remove_headings(markdown_content: str) -> str:
-    return re.sub(HEADING_PATTERN, "", markdown_content)
-
-
-@cache
-def remove_links(markdown_content: str) -> str:
-    return re.sub(
-        LINK_PATTERN,
-        lambda match: cast(str, match.groupdict().get("text")),
-        markdown_content,
-    )
+@lru_cache(maxsize=256)
+def clean_markdown(markdown_content: str, *, skip_preamble: bool = False) -> str:
+    """Remove headings and images, then replace links with their text."""
+    if skip_preamble and (first_heading := HEADING_PATTERN.search(markdown_content)):
+        markdown_content = markdown_content[first_heading.end() :]
+    # Images must go first, links may wrap them (badges)
+    markdown_content = STRIP_PATTERN.sub("", markdown_content)
+    markdown_content = LINK_PATTERN.sub(_link_text, markdown_content)
+    return clean_new_lines(markdown_content)
 
 
-@cache
-def remove_everything_before_first_heading(markdown_content: str) -> str:
-    first_heading = re.search(HEADING_PATTERN, markdown_content)
-    if first_heading:
-        markdown_content = markdown_content[first_heading.end() :]
-    return markdown_content
+def _link_text(match: re.Match) -> str:
+    return cast(str, match.group("text"))
 
 
-@cache
+@lru_cache(maxsize=256)
 def clean_new_lines(markdown_content: str) -> str:
-    return re.sub(EMPTY_LINES_PATTERN, "\n\n", markdown_content).strip()
+    return EMPTY_LINES_PATTERN.sub("\n\n", markdown_content).strip()
@@ -15,6 +15,7 @@
 # limitations under the License.
 
 import contextlib
+from concurrent.futures import ThreadPoolExecutor
 from typing import Any
 
 import requests
@@ -69,21 +70,26 @@ def openapi_aggregator(app: FastAPI, services_conf: dict[str, dict[str, Any]]) -
 def prune_openapi_schema_paths(
     openapi_schema: dict[str, Any], paths: list[str]
 ) -> None:
-    for prefix_path in paths:
-        openapi_paths = openapi_schema["paths"]
-        for path in [*openapi_paths]:
-            if path.startswith(prefix_path):
-                openapi_paths.pop(path)
+    prefix_paths = tuple(paths)
+    openapi_paths = openapi_schema["paths"]
+    for path in [p for p in openapi_paths if p.startswith(prefix_paths)]:
+        openapi_paths.pop(path)
 
 
 def resolve_services(services_conf: dict[str, dict[str, Any]]) -> list[dict[str, Any]]:
-    services: list[dict[str, Any]] = []
-    for service in services_conf.values():
-        response = requests.get(service["openapi"], timeout=10)
-        if response.ok:
-            with contextlib.suppress(requests.JSONDecodeError):
-                services.append({**service, "openapi_schema": response.json()})
-    return services
+    if not services_conf:
+        return []
+    with ThreadPoolExecutor(max_workers=len(services_conf)) as executor:
+        services = executor.map(resolve_service, services_conf.values())
+        return [service for service in services if service]
+
+
+def resolve_service(service: dict[str, Any]) -> dict[str, Any] | None:
+    response = requests.get(service["openapi"], timeout=10)
+    if response.ok:
+        with contextlib.suppress(requests.JSONDecodeError):
+            return {**service, "openapi_schema": response.json()}
+    return None
 
 
 def build_openapi_schema(
@@ -14,13 +14,123 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import contextlib
+import gc
 import os
-from multiprocessing import cpu_count
+import resource
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from gunicorn.arbiter import Arbiter
+    from gunicorn.workers.base import Worker
+
+CGROUP_CPU_MAX = "/sys/fs/cgroup/cpu.max"
+CGROUP_MEMORY_MAX = "/sys/fs/cgroup/memory.max"
+
+
+def available_cpus() -> int:
+    """Cpus usable by the process, accounting for affinity and cgroup quota."""
+    try:
+        cpus = len(os.sched_getaffinity(0))
+    except AttributeError:  # Not available on every platform (macOS)
+        cpus = os.cpu_count() or 1
+    with contextlib.suppress(OSError, ValueError), open(CGROUP_CPU_MAX) as f:
+        quota, period = f.read().split()
+        if quota != "max":
+            cpus = min(cpus, max(1, int(quota) // int(period)))
+    return cpus
+
+
+def available_memory() -> int | None:
+    """Memory limit of the container if any, else physical memory, in bytes."""
+    with contextlib.suppress(OSError, ValueError), open(CGROUP_MEMORY_MAX) as f:
+        return int(f.read().strip())
+    try:
+        return os.sysconf("SC_PAGE_SIZE") * os.sysconf("SC_PHYS_PAGES")
+    except (OSError, ValueError):
+        return None
+
+
+def default_workers() -> int:
+    """One worker per cpu plus one, capped by what the memory can hold."""
+    workers = min(available_cpus() + 1, int(os.environ.get("GUNICORN_MAX_WORKERS", 16)))
+    worker_memory = int(os.environ.get("GUNICORN_WORKER_MEMORY", 250)) * 2**20
+    if memory := available_memory():
+        workers = min(workers, max(2, memory // worker_memory))
+    return workers
+
+
+def raise_open_files_limit(wanted: int) -> None:
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    if soft < wanted:
+        limit = wanted if hard == resource.RLIM_INFINITY else min(wanted, hard)
+        resource.setrlimit(resource.RLIMIT_NOFILE, (limit, hard))
+
 
 daemon = False
-bind = os.environ.get("GUNICORN_BIND", "0.0.0.0:8000")
-workers = int(os.environ.get("GUNICORN_WORKERS", 2 * cpu_count()))
+# Comma-separated, e.g. "unix:/run/sharinghub.sock,0.0.0.0:8000"
+bind = os.environ.get("GUNICORN_BIND", "0.0.0.0:8000").split(",")
+workers = int(
+    os.environ.get("GUNICORN_WORKERS")
+    or os.environ.get("WEB_CONCURRENCY")
+    or default_workers()
+)
 worker_class = os.environ.get("GUNICORN_WORKER_CLASS", "uvicorn.workers.UvicornWorker")
 worker_connections = int(os.environ.get("GUNICORN_WORKER_CONNECTIONS", 1000))
+threads = int(os.environ.get("GUNICORN_THREADS", 1))
+# Client connections, upstream connections (GitLab, S3) and some headroom
+raise_open_files_limit(worker_connections * 4 + 128)
+# Effective value is capped by the net.core.somaxconn kernel setting
+reuse_port = os.environ.get("GUNICORN_REUSE_PORT", "false").lower() in ("true", "1")
+backlog = int(
+    os.environ.get(
+        "GUNICORN_BACKLOG", min(65535, max(2048, worker_connections * workers))
+    )
+)
+worker_tmp_dir = os.environ.get(
+    "GUNICORN_WORKER_TMP_DIR", "/dev/shm" if os.path.isdir("/dev/shm") else None
+)
 timeout = int(os.environ.get("GUNICORN_TIMEOUT", 60))
+graceful_timeout = int(os.environ.get("GUNICORN_GRACEFUL_TIMEOUT", timeout))
+keepalive = int(os.environ.get("GUNICORN_KEEPALIVE", 75))
+max_requests = int(os.environ.get("GUNICORN_MAX_REQUESTS", 5000))
+max_requests_jitter = int(os.environ.get("GUNICORN_MAX_REQUESTS_JITTER", 500))
+limit_request_line = int(os.environ.get("GUNICORN_LIMIT_REQUEST_LINE", 8190))
+limit_request_fields = int(os.environ.get("GUNICORN_LIMIT_REQUEST_FIELDS", 100))
+limit_request_field_size = int(
+    os.environ.get("GUNICORN_LIMIT_REQUEST_FIELD_SIZE", 8190)
+)
 wsgi_app = os.environ.get("GUNICORN_APP", "app.main:app")
+# Access log is disabled unless a target is given ("-" for stdout)
+accesslog = os.environ.get("GUNICORN_ACCESSLOG")
+errorlog = os.environ.get("GUNICORN_ERRORLOG", "-")
+statsd_host = os.environ.get("GUNICORN_STATSD_HOST")
+statsd_prefix = os.environ.get("GUNICORN_STATSD_PREFIX", "sharinghub")
+pin_cpus = os.environ.get("GUNICORN_PIN_CPUS", "false").lower() in ("true", "1")
+# Off by default: module-level clients (boto3) must not be shared across forks,
+# and a preloaded application is not reloaded on HUP
+preload_app = os.environ.get("GUNICORN_PRELOAD", "false").lower() in ("true", "1")
+
+
+def on_starting(server: "Arbiter") -> None:
+    server.log.info(
+        "Open files limit: %s", resource.getrlimit(resource.RLIMIT_NOFILE)[0]
+    )
+    if threads > 1 and worker_class.startswith("uvicorn."):
+        server.log.warning(
+            "GUNICORN_THREADS=%s is ignored by the %s worker class",
+            threads,
+            worker_class,
+        )
+
+
+def pre_fork(_server: "Arbiter", _worker: "Worker") -> None:
+    if preload_app:
+        # Keep preloaded objects out of GC scans so workers do not dirty shared pages
+        gc.freeze()
+
+
+def post_fork(_server: "Arbiter", worker: "Worker") -> None:
+    if pin_cpus and hasattr(os, "sched_setaffinity"):
+        cpus = sorted(os.sched_getaffinity(0))
+        os.sched_setaffinity(0, {cpus[worker.age % len(cpus)]})
@@ -0,0 +1,49 @@
+# Copyright 2025, CS GROUP - France, https://www.csgroup.eu/
+#
+# This file is part of SharingHub project
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from app.utils.markdown import clean_markdown, parse
+
+
+def test_clean_markdown_removes_badge_links() -> None:
+    content = (
+        "[![build](https://img.shields.io/x.svg)](https://ci/x) "
+        "Some text [doc](https://d) here."
+    )
+    assert clean_markdown(content) == "Some text doc here."
+
+
+def test_clean_markdown_skip_preamble() -> None:
+    content = "# Title\n\nintro\n## Sub\n![a](b)\n\n\n\n[x](https://y) end"
+    assert clean_markdown(content, skip_preamble=True) == "intro\n\nx end"
+
+
+def test_parse_front_matter() -> None:
+    content = "---\ntitle: a --- b\n---\n\n# Doc\n"
+    assert parse(content) == ("# Doc\n", {"title": "a --- b"})
+
+
+def test_parse_front_matter_dots_end() -> None:
+    content = "---\ntitle: Doc\n...\nBody"
+    assert parse(content) == ("Body", {"title": "Doc"})
+
+
+def test_parse_empty_front_matter() -> None:
+    assert parse("---\n---\nBody") == ("Body", {})
+
+
+def test_parse_horizontal_rule_without_front_matter() -> None:
+    content = "---\n\nSome text"
+    assert parse(content) == (content, {})